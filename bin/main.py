@@ -18,12 +18,14 @@ import pymia.evaluation.writer as writer
 try:
     import mialab.data.structure as structure
     import mialab.utilities.file_access_utilities as futil
+    import mialab.utilities.multi_processor as mproc
     import mialab.utilities.pipeline_utilities as putil
 except ImportError:
     # Append the MIALab root directory to Python path
     sys.path.insert(0, os.path.join(os.path.dirname(sys.argv[0]), '..'))
     import mialab.data.structure as structure
     import mialab.utilities.file_access_utilities as futil
+    import mialab.utilities.multi_processor as mproc
     import mialab.utilities.pipeline_utilities as putil
 
 LOADING_KEYS = [structure.BrainImageTypes.T1w,
@@ -48,6 +50,9 @@ def main(result_dir: str, data_atlas_dir: str, data_train_dir: str, data_test_di
         - Evaluation of the segmentation
     """
 
+    # use all CPUs available to this process for the ITK filters, unless configured by the environment
+    mproc.set_default_number_of_threads()
+
     # load atlas images
     putil.load_atlas_images(data_atlas_dir)
 
@@ -60,6 +65,7 @@ def main(result_dir: str, data_atlas_dir: str, data_train_dir: str, data_test_di
                                           futil.DataDirectoryFilter())
     pre_process_params = {'skullstrip_pre': True,
                           'normalization_pre': True,
+                          'masked_normalization_pre': False,  # replaces skullstrip_pre and normalization_pre if True
                           'registration_pre': False,  # FIXME : switched off, perhaps it fixes the unfitting brains
                           'coordinates_feature': True,
                           'intensity_feature': True,
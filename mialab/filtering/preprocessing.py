@@ -27,12 +27,32 @@ class ImageNormalization(pymia_fltr.Filter):
             sitk.Image: The normalized image.
         """
 
-        img_arr = sitk.GetArrayFromImage(image)
-
-        # todo: normalize the image using numpy
-        img_arr = (img_arr - np.min(img_arr)) / (np.max(img_arr) - np.min(img_arr))
-
-        # warnings.warn('No normalization implemented. Returning unprocessed image.')
+        if image.GetPixelID() not in (sitk.sitkUInt8, sitk.sitkUInt16):
+            # the min-max rescale runs natively (multi-threaded) and keeps the image information,
+            # the cast to float32 prevents integer images from being quantized to {0, 1}, float64 images stay float64
+            if image.GetPixelID() not in (sitk.sitkFloat32, sitk.sitkFloat64):
+                image = sitk.Cast(image, sitk.sitkFloat32)
+            rescale_filter = sitk.RescaleIntensityImageFilter()
+            rescale_filter.SetOutputMinimum(0.0)
+            rescale_filter.SetOutputMaximum(1.0)
+            return rescale_filter.Execute(image)
+
+        # minimum and maximum in a single multi-threaded pass over the ITK buffer
+        min_max_filter = sitk.MinimumMaximumImageFilter()
+        min_max_filter.Execute(image)
+        mn, mx = min_max_filter.GetMinimum(), min_max_filter.GetMaximum()
+        scale = 1.0 / (mx - mn) if mx > mn else 0.0  # a constant image is mapped to zero
+        # keep the shift and scale in single precision such that no operand promotes the arithmetic to float64
+        mn, scale = np.float32(mn), np.float32(scale)
+
+        # a zero-copy view on the ITK buffer is sufficient since the gather below allocates the output anyway
+        img_view = sitk.GetArrayViewFromImage(image)
+
+        # only 2^8 or 2^16 distinct intensities exist, so normalize a lookup table and gather from it
+        lut = np.arange(np.iinfo(img_view.dtype).max + 1, dtype=np.float32)
+        np.subtract(lut, mn, out=lut)
+        np.multiply(lut, scale, out=lut)
+        img_arr = np.take(lut, img_view)
 
         img_out = sitk.GetImageFromArray(img_arr)
         img_out.CopyInformation(image)
@@ -58,6 +78,9 @@ class SkullStrippingParameters(pymia_fltr.FilterParams):
         Args:
             img_mask (sitk.Image): The brain mask image.
         """
+        # cast once here such that the parameters can be reused for several images without casting again
+        if img_mask.GetPixelID() != sitk.sitkUInt8:
+            img_mask = sitk.Cast(img_mask, sitk.sitkUInt8)
         self.img_mask = img_mask
 
 
@@ -78,10 +101,9 @@ class SkullStripping(pymia_fltr.Filter):
         Returns:
             sitk.Image: The normalized image.
         """
-        mask = params.img_mask  # the brain mask
+        mask = params.img_mask  # the brain mask, already of type UInt8
 
         # todo: remove the skull from the image by using the brain mask
-        mask = sitk.Cast(mask, sitk.sitkUInt8)
         image = sitk.Mask(image, mask)
 
         # warnings.warn('No skull-stripping implemented. Returning unprocessed image.')
@@ -98,6 +120,100 @@ class SkullStripping(pymia_fltr.Filter):
             .format(self=self)
 
 
+class MaskedImageNormalization(pymia_fltr.Filter):
+    """Represents a skull-stripping and normalization filter fused into one filter.
+
+    The image is read twice, once for the minimum and maximum and once for the shift and scale, but no separate
+    skull-stripped volume is written as by :class:`SkullStripping` followed by :class:`ImageNormalization`.
+    In contrast to these two filters, the minimum and maximum are computed within the brain mask only,
+    such that the zero background does not skew the normalization.
+    """
+
+    def __init__(self, block_size: int = 2 ** 18):
+        """Initializes a new instance of the MaskedImageNormalization class.
+
+        Args:
+            block_size (int): The number of voxels processed at once, the default of 2^18 float32 voxels (1 MB)
+                fits into the L2 cache of most CPUs.
+        """
+        super().__init__()
+        self.block_size = block_size
+
+    def execute(self, image: sitk.Image, params: SkullStrippingParameters = None) -> sitk.Image:
+        """Executes a skull stripping and a min-max normalization within the brain mask on an image.
+
+        Args:
+            image (sitk.Image): The image.
+            params (SkullStrippingParameters): The parameters with the brain mask.
+
+        Returns:
+            sitk.Image: The skull-stripped and normalized image, where the background is zero. As for
+            :class:`ImageNormalization`, the pixel type is float64 for float64 images and float32 otherwise.
+
+        Raises:
+            ValueError: If the image and the brain mask do not share the same image grid.
+        """
+        # the buffers are paired voxel by voxel, hence, be as strict as sitk.Mask about the image grids
+        img_mask = params.img_mask
+        if image.GetSize() != img_mask.GetSize():
+            raise ValueError('image and mask need to have the same size, got {} and {}'
+                             .format(image.GetSize(), img_mask.GetSize()))
+        coordinate_tolerance = sitk.ProcessObject.GetGlobalDefaultCoordinateTolerance() * abs(image.GetSpacing()[0])
+        direction_tolerance = sitk.ProcessObject.GetGlobalDefaultDirectionTolerance()
+        for name, get_property, tolerance in (('origin', sitk.Image.GetOrigin, coordinate_tolerance),
+                                              ('spacing', sitk.Image.GetSpacing, coordinate_tolerance),
+                                              ('direction', sitk.Image.GetDirection, direction_tolerance)):
+            if not np.allclose(get_property(image), get_property(img_mask), rtol=0, atol=tolerance):
+                raise ValueError('image and mask need to have the same {}, got {} and {}'
+                                 .format(name, get_property(image), get_property(img_mask)))
+
+        # flat views on the contiguous ITK buffers, such that the volume can be processed block by block
+        img_arr = sitk.GetArrayViewFromImage(image)
+        img_flat = img_arr.ravel()
+        mask_flat = sitk.GetArrayViewFromImage(img_mask).ravel()
+        blocks = range(0, img_flat.size, self.block_size)
+
+        # reduce over the brain voxels only, the initial values are the limits of the pixel type.
+        # Both reductions run on the same block, which is still in the cache for the second one
+        limits = np.iinfo(img_arr.dtype) if np.issubdtype(img_arr.dtype, np.integer) else np.finfo(img_arr.dtype)
+        mn, mx = float(limits.max), float(limits.min)
+        for i in blocks:
+            img_block = img_flat[i:i + self.block_size]
+            mask_block = mask_flat[i:i + self.block_size] != 0
+            mn = min(mn, float(img_block.min(where=mask_block, initial=limits.max)))
+            mx = max(mx, float(img_block.max(where=mask_block, initial=limits.min)))
+        if mx < mn:
+            mn = mx = 0.0  # the mask selects no voxel, the limits of the pixel type may not fit into float32
+        scale = 1.0 / (mx - mn) if mx > mn else 0.0  # a constant (or empty) brain region is mapped to zero
+        # same output type as ImageNormalization: float64 images stay float64, all others become float32
+        out_dtype = np.float64 if img_arr.dtype == np.float64 else np.float32
+        mn, scale = out_dtype(mn), out_dtype(scale)
+
+        # only the brain voxels are written, the background keeps the zeros of the output buffer.
+        # Masking, shift and scale are chained per block such that the block stays in the cache for all of them
+        out_arr = np.zeros(img_arr.shape, dtype=out_dtype)
+        out_flat = out_arr.ravel()
+        for i in blocks:
+            out_block = out_flat[i:i + self.block_size]
+            mask_block = mask_flat[i:i + self.block_size] != 0
+            np.subtract(img_flat[i:i + self.block_size], mn, out=out_block, where=mask_block)
+            np.multiply(out_block, scale, out=out_block, where=mask_block)
+
+        img_out = sitk.GetImageFromArray(out_arr)
+        img_out.CopyInformation(image)
+
+        return img_out
+
+    def __str__(self):
+        """Gets a printable string representation.
+
+        Returns:
+            str: String representation.
+        """
+        return 'MaskedImageNormalization:\n' \
+            .format(self=self)
+
+
 class ImageRegistrationParameters(pymia_fltr.FilterParams):
     """Image registration parameters."""
 
@@ -120,6 +236,9 @@ class ImageRegistration(pymia_fltr.Filter):
     def __init__(self):
         """Initializes a new instance of the ImageRegistration class."""
         super().__init__()
+        # one resampler per instance, such that an instance shared by several images does not rebuild it on each call
+        self.resample_filter = sitk.ResampleImageFilter()
+        self.resample_filter.SetDefaultPixelValue(0.0)
 
     def execute(self, image: sitk.Image, params: ImageRegistrationParameters = None) -> sitk.Image:
         """Registers an image.
@@ -144,15 +263,18 @@ class ImageRegistration(pymia_fltr.Filter):
         """image = sitk.Resample(image1=image, referenceImage=atlas, transform=transform,
                               interpolator=sitk.sitkNearestNeighbor)  # """
 
+        # FIXME : using "referenceImage = atlas," gives error for not matching shapes in ITK-SNAP
+        self.resample_filter.SetReferenceImage(image)
+        self.resample_filter.SetTransform(transform)
         if is_ground_truth:
-            image = sitk.Resample(image1=image, transform=transform,
-                                  interpolator=sitk.sitkNearestNeighbor,
-                                  defaultPixelValue=0.0, outputPixelType=image.GetPixelIDValue())
+            self.resample_filter.SetOutputPixelType(image.GetPixelID())
+            self.resample_filter.SetInterpolator(sitk.sitkNearestNeighbor)
         else:
-            # FIXME : using "referenceImage = atlas," gives error for not matching shapes in ITK-SNAP
-            image = sitk.Resample(image1=image, transform=transform,
-                                  interpolator=sitk.sitkBSpline,
-                                  defaultPixelValue=0.0, outputPixelType=image.GetPixelIDValue())  # """
+            # single precision output regardless of the input type, the intensities are floats from here on anyway
+            self.resample_filter.SetOutputPixelType(sitk.sitkFloat32)
+            # linear interpolation is a fraction of the cost of a B-spline and sufficient for the 1 mm voxels used later
+            self.resample_filter.SetInterpolator(sitk.sitkLinear)
+        image = self.resample_filter.Execute(image)
 
         # note: if you are interested in registration, and want to test it, have a look at
         # pymia.filtering.registration.MultiModalRegistration. Think about the type of registration, i.e.
@@ -188,6 +310,12 @@ class Filtering(pymia_fltr.Filter):
         """Initializes a new instance of the filtering class."""
         super().__init__()
 
+        # no variant in execute is enabled. Once the smoothing variant is, enable its filter setup here as well
+        # such that every call of execute reuses it
+        """ smoothing
+        self.gaussian_filter = sitk.SmoothingRecursiveGaussianImageFilter()
+        self.gaussian_filter.SetSigma(0.5)  # """
+
     def execute(self, image: sitk.Image, params: FilteringParameters = None) -> sitk.Image:
         """Executes a filtering on an image.
 
@@ -199,24 +327,13 @@ class Filtering(pymia_fltr.Filter):
             sitk.Image: The filtered image.
         """
 
-        """meanfilter = sitk.MeanImageFilter()
-        meanfilter.SetRadius(1)
-        image = meanfilter.Execute(image)"""
-        """
-        # Create referece for Histogrammatching
-        atlas = params.atlas
-        atlas_image = sitk.Cast(atlas, sitk.sitkFloat64)
-
-        meanfilter = sitk.MeanImageFilter()
-        meanfilter.SetRadius(1)
-        #image = meanfilter.Execute(image)
-
-        gaussian = sitk.SmoothingRecursiveGaussianImageFilter()
-        gaussian.SetSigma(float(0.5))
-        image = gaussian.Execute(image)
+        """ smoothing (enable self.gaussian_filter in __init__ as well)
+        # a single recursive (IIR) Gaussian costs a few multiplications per voxel independent of sigma.
+        # Do not chain it with a mean filter, which is only another smoothing pass over the whole volume
+        image = self.gaussian_filter.Execute(image)  # """
 
-        normfilter = sitk.NormalizeImageFilter()
-        #image = normfilter.Execute(image)
+        """ histogram matching to the atlas
+        atlas_image = sitk.Cast(params.atlas, sitk.sitkFloat64)
 
         hist_matching_filter = sitk.HistogramMatchingImageFilter()
         hist_matching_filter.SetNumberOfHistogramLevels(256)
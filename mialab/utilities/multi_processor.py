@@ -1,4 +1,5 @@
 """Module for the management of multi-process function calls."""
+import os
 import typing as t
 
 import numpy as np
@@ -249,6 +250,33 @@ class PostProcessingPickleHelper(DefaultPickleHelper):
         return conversion.NumpySimpleITKImageBridge.convert(np_img, image_properties)
 
 
+def set_default_number_of_threads():
+    """Sets the number of ITK threads to the number of CPUs available to the calling process.
+
+    ITK does not use all cores in every environment, therefore, drivers should call this function once before
+    processing. Nothing is changed if ITK_GLOBAL_DEFAULT_NUMBER_OF_THREADS or ITK_NUMBER_OF_THREADS is set, since ITK
+    reads these environment variables itself (e.g. in a job script on a cluster node).
+    """
+    if 'ITK_GLOBAL_DEFAULT_NUMBER_OF_THREADS' in os.environ or 'ITK_NUMBER_OF_THREADS' in os.environ:
+        return
+
+    # the affinity respects CPU restrictions of the process (e.g. by SLURM), os.cpu_count() does not
+    if hasattr(os, 'sched_getaffinity'):
+        number_of_threads = len(os.sched_getaffinity(0))
+    else:
+        number_of_threads = os.cpu_count() or 1
+    sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(number_of_threads)
+
+
+def _set_single_threaded():
+    """Restricts ITK to a single thread in the calling process.
+
+    Used as initializer of the worker processes: the images are already processed in parallel by the workers, and
+    additional ITK threads per worker would only oversubscribe the cores.
+    """
+    sitk.ProcessObject.SetGlobalDefaultNumberOfThreads(1)
+
+
 class MultiProcessor:
     """Class managing multiprocessing"""
 
@@ -256,6 +284,9 @@ class MultiProcessor:
     def run(fn: callable, param_list: iter, fn_kwargs: dict = None, pickle_helper_cls: type = DefaultPickleHelper):
         """ Executes the function ``fn`` in parallel (different processes) for each parameter in the parameter list.
 
+        ITK runs single-threaded in each worker process such that the process-level parallelism does not compete with
+        the ITK threads for the cores.
+
         Args:
             fn (callable): Function to be executed in another process.
             param_list (List[tuple]): List containing the parameters for each ``fn`` call.
@@ -273,7 +304,7 @@ class MultiProcessor:
         param_list = ((*p, fn_kwargs) for p in param_list)
         param_list = (helper.make_params_picklable(params) for params in param_list)
 
-        with pmp.Pool() as p:
+        with pmp.Pool(initializer=_set_single_threaded) as p:
             ret_vals = p.starmap(MultiProcessor._wrap_fn(fn, pickle_helper_cls), param_list)
         ret_vals = [helper.recover_return_value(ret_val) for ret_val in ret_vals]
         return ret_vals
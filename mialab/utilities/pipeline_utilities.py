@@ -192,11 +192,16 @@ def pre_process(id_: str, paths: dict, **kwargs) -> structure.BrainImage:
     transform = sitk.ReadTransform(path_to_transform)
     img = structure.BrainImage(id_, path, img, transform)
 
+    # one registration filter is shared by the pipelines of this image such that its resampler is reused.
+    # The filtering filter is shared as well, which only pays off once a variant with a cached filter is enabled
+    registration = fltr_prep.ImageRegistration()
+    filtering = fltr_prep.Filtering()
+
     # construct pipeline for brain mask registration
     # we need to perform this before the T1w and T2w pipeline because the registered mask is used for skull-stripping
     pipeline_brain_mask = fltr.FilterPipeline()
     if kwargs.get('registration_pre', False):
-        pipeline_brain_mask.add_filter(fltr_prep.ImageRegistration())
+        pipeline_brain_mask.add_filter(registration)
         pipeline_brain_mask.set_param(fltr_prep.ImageRegistrationParameters(atlas_t1, img.transformation, True),
                                       len(pipeline_brain_mask.filters) - 1)
 
@@ -204,20 +209,33 @@ def pre_process(id_: str, paths: dict, **kwargs) -> structure.BrainImage:
     img.images[structure.BrainImageTypes.BrainMask] = pipeline_brain_mask.execute(
         img.images[structure.BrainImageTypes.BrainMask])
 
+    # the masked normalization performs skull-stripping and normalization in one filter and takes precedence
+    masked_normalization_pre = kwargs.get('masked_normalization_pre', False)
+    skullstrip_pre = kwargs.get('skullstrip_pre', False) and not masked_normalization_pre
+    normalization_pre = kwargs.get('normalization_pre', False) and not masked_normalization_pre
+
+    # the skull-stripping parameters are shared by the T1w and T2w pipeline such that the mask is cast only once
+    skullstrip_params = None
+    if skullstrip_pre or masked_normalization_pre:
+        skullstrip_params = fltr_prep.SkullStrippingParameters(img.images[structure.BrainImageTypes.BrainMask])
+
     # construct pipeline for T1w image pre-processing
     pipeline_t1 = fltr.FilterPipeline()
     if kwargs.get('registration_pre', False):
-        pipeline_t1.add_filter(fltr_prep.ImageRegistration())
+        pipeline_t1.add_filter(registration)
         pipeline_t1.set_param(fltr_prep.ImageRegistrationParameters(atlas_t1, img.transformation),
                               len(pipeline_t1.filters) - 1)
-    if kwargs.get('skullstrip_pre', False):
+    if skullstrip_pre:
         pipeline_t1.add_filter(fltr_prep.SkullStripping())
-        pipeline_t1.set_param(fltr_prep.SkullStrippingParameters(img.images[structure.BrainImageTypes.BrainMask]),
-                              len(pipeline_t1.filters) - 1)
-    if kwargs.get('normalization_pre', False):
+        pipeline_t1.set_param(skullstrip_params, len(pipeline_t1.filters) - 1)
+    if normalization_pre:
         pipeline_t1.add_filter(fltr_prep.ImageNormalization())
+    if masked_normalization_pre:
+        # skull-stripping and normalization within the brain mask without a separate skull-stripped volume
+        pipeline_t1.add_filter(fltr_prep.MaskedImageNormalization())
+        pipeline_t1.set_param(skullstrip_params, len(pipeline_t1.filters) - 1)
     if kwargs.get('filtering_pre', False):
-        pipeline_t1.add_filter(fltr_prep.Filtering())
+        pipeline_t1.add_filter(filtering)
         pipeline_t1.set_param(fltr_prep.FilteringParameters(atlas_t1),
                               len(pipeline_t1.filters) - 1)
 
@@ -228,17 +246,20 @@ def pre_process(id_: str, paths: dict, **kwargs) -> structure.BrainImage:
     # construct pipeline for T2w image pre-processing
     pipeline_t2 = fltr.FilterPipeline()
     if kwargs.get('registration_pre', False):
-        pipeline_t2.add_filter(fltr_prep.ImageRegistration())
+        pipeline_t2.add_filter(registration)
         pipeline_t2.set_param(fltr_prep.ImageRegistrationParameters(atlas_t2, img.transformation),
                               len(pipeline_t2.filters) - 1)
-    if kwargs.get('skullstrip_pre', False):
+    if skullstrip_pre:
         pipeline_t2.add_filter(fltr_prep.SkullStripping())
-        pipeline_t2.set_param(fltr_prep.SkullStrippingParameters(img.images[structure.BrainImageTypes.BrainMask]),
-                              len(pipeline_t2.filters) - 1)
-    if kwargs.get('normalization_pre', False):
+        pipeline_t2.set_param(skullstrip_params, len(pipeline_t2.filters) - 1)
+    if normalization_pre:
         pipeline_t2.add_filter(fltr_prep.ImageNormalization())
+    if masked_normalization_pre:
+        # skull-stripping and normalization within the brain mask without a separate skull-stripped volume
+        pipeline_t2.add_filter(fltr_prep.MaskedImageNormalization())
+        pipeline_t2.set_param(skullstrip_params, len(pipeline_t2.filters) - 1)
     if kwargs.get('filtering_pre', False):
-        pipeline_t2.add_filter(fltr_prep.Filtering())
+        pipeline_t2.add_filter(filtering)
         pipeline_t2.set_param(fltr_prep.FilteringParameters(atlas_t2),
                               len(pipeline_t2.filters) - 1)
 
@@ -248,7 +269,7 @@ def pre_process(id_: str, paths: dict, **kwargs) -> structure.BrainImage:
     # construct pipeline for ground truth image pre-processing
     pipeline_gt = fltr.FilterPipeline()
     if kwargs.get('registration_pre', False):
-        pipeline_gt.add_filter(fltr_prep.ImageRegistration())
+        pipeline_gt.add_filter(registration)
         pipeline_gt.set_param(fltr_prep.ImageRegistrationParameters(atlas_t1, img.transformation, True),
                               len(pipeline_gt.filters) - 1)
 